@@ -631,7 +631,7 @@ def search_page():
     )
 
     sort_by = request.args.get("sort_by", "modified")
-    if sort_by not in SearchSortEnum.good_values():
+    if not SearchSortEnum.is_good_value(sort_by):
         sort_by = "modified"
 
     filter_risque = 0
@@ -38,10 +38,11 @@ BCRYPT = Bcrypt()
 db = SQLAlchemy()
 
 def connect_db(app: Flask) -> None:
-    """Connects this database to the given Flask application."""
+    """Connects this database & password hasher to the given Flask application."""
 
     db.app = app
     db.init_app(app)
+    BCRYPT.init_app(app)
 
 def get_current_time() -> datetime.datetime:
     """Retrieves the current UTC time."""
@@ -975,6 +976,12 @@ class Story(IJsonableModel):
         DEFAULT = PRIVATE | CAN_COMMENT
 
     __tablename__ = "stories"
+    __table_args__ = (
+        # partial index for the default (non-risque) search path, newest first like its results
+        db.Index("ix_stories_not_risque", db.text("modified DESC"),
+            postgresql_where = db.text(f"(flags & {int(Flags.IS_RISQUE)}) = 0")
+        ),
+    )
 
     DEFAULT_THUMBNAIL_URI = "/static/images/thumbnails/default0.png"
 
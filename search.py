@@ -18,7 +18,29 @@ class SearchSortEnum(enum.Enum):
 
     @classmethod
     def good_values(cls) -> List[str]:
-        return [ v for v in map(lambda x: x.lower(), cls.__members__.keys()) ]
+        return list(_SORT_VALUES)
+
+    @classmethod
+    def is_good_value(cls, value: str) -> bool:
+        return value in _SORT_VALUE_SET
+
+# built once, in declaration order for error messages & as a set for membership checks
+_SORT_VALUES = tuple(k.lower() for k in SearchSortEnum.__members__)
+_SORT_VALUE_SET = frozenset(_SORT_VALUES)
+
+# maps a sort_by value to a function returning the decorated query & its ordering expression
+_SORT_DISPATCH: Dict[str, Callable[[BaseQuery], Tuple[BaseQuery, Any]]] = {
+    SearchSortEnum.MODIFIED.value: lambda q: (q, Story.modified),
+    SearchSortEnum.POSTED.value: lambda q: (q, Story.posted),
+    SearchSortEnum.FAVORITES.value: lambda q: (
+        q.join(Story.favorited_by, isouter=True).group_by(Story.id),
+        func.count(User.id)
+    ),
+    SearchSortEnum.FOLLOWS.value: lambda q: (
+        q.join(Story.followed_by, isouter=True).group_by(Story.id),
+        func.count(User.id)
+    )
+}
 
 class SearchResults:
     """An object containing results from a search query."""
@@ -148,13 +170,13 @@ class SearchResults:
                 escaped_phrase = phrase.replace('/', '//').replace('%', '/%').replace("'", "/'")
 
                 clauses.append(or_(
-                    Story.title.ilike(f"'%{escaped_phrase}%'", escape='/'),
-                    Story.summary.ilike(f"'%{escaped_phrase}%'", escape='/'),
+                    Story.title.ilike(f"%{escaped_phrase}%", escape='/'),
+                    Story.summary.ilike(f"%{escaped_phrase}%", escape='/'),
                     or_(
                         Chapter.author_notes == None,
-                        Chapter.author_notes.ilike(f"'%{escaped_phrase}%'", escape='/')
+                        Chapter.author_notes.ilike(f"%{escaped_phrase}%", escape='/')
                     ),
-                    Chapter.text.ilike(f"'%{escaped_phrase}%'", escape='/')
+                    Chapter.text.ilike(f"%{escaped_phrase}%", escape='/')
                 ))
             
             return or_(*clauses)
@@ -173,7 +195,7 @@ class SearchResults:
             errors.append("'sort_by' must be a string.")
         elif sort_by is None:
             sort_by = "modified"
-        elif sort_by not in SearchSortEnum.good_values():
+        elif not SearchSortEnum.is_good_value(sort_by):
             errors.append(f"'sort_by' must be one of: {', '.join(SearchSortEnum.good_values())}")
 
         if type(descending) != bool:
@@ -182,6 +204,7 @@ class SearchResults:
         if filter_risque is not None and type(filter_risque) != bool:
             errors.append("'filter_risque' must be a boolean or null.")
         
+        num_include_tags = len(include_tags)
         include_tags = check_set("include_tags", include_tags, lambda x: Tag.get(x).id)
         exclude_tags = check_set("exclude_tags", exclude_tags, lambda x: Tag.get(x).id)
 
@@ -204,6 +227,26 @@ class SearchResults:
         if len(errors) > 0:
             raise ValueError("\n".join(errors))
 
+        # narrow included users down to those that exist
+        had_include_users = len(include_users) > 0
+        if had_include_users:
+            include_users = {
+                username for (username,) in db.session.query(User.username).filter(
+                    User.username.in_(include_users)
+                ).all()
+            }
+
+        # no stories can match if none of the included tags or users exist
+        if (
+            (num_include_tags > 0 and len(include_tags) == 0) or
+            (had_include_users and len(include_users) == 0)
+        ):
+            self.results = []
+            self.num_results = 0
+            self.start = 0
+            self.end = 0
+            return
+
         results = Story.visible_stories(user)
 
         # filter tags
@@ -250,18 +293,8 @@ class SearchResults:
                 Story.flags.op('&')(Story.Flags.IS_RISQUE) != 0
             )
 
-        ordering = None
-        if sort_by == "modified":
-            ordering = Story.modified
-        elif sort_by == "posted":
-            ordering = Story.posted
-        elif sort_by == "favorites":
-            results = results.join(Story.favorited_by, isouter=True).group_by(Story.id)
-            ordering = func.count(User.id)
-        elif sort_by == "follows":
-            results = results.join(Story.followed_by, isouter=True).group_by(Story.id)
-            ordering = func.count(User.id)
-        
+        results, ordering = _SORT_DISPATCH[sort_by](results)
+
         results = results.distinct(Story.id, ordering)
         if descending:
            ordering = ordering.desc()
@@ -275,13 +308,6 @@ class SearchResults:
 
         self.start = min(offset + 1, self.num_results)
         self.end = min(offset + count, self.num_results)
-        
-        if filter_risque is None:
-            filter_risque = 0
-        elif filter_risque:
-            filter_risque = 1
-        else:
-            filter_risque = -1
 
     def to_json(self) -> JSONType:
         return {
@@ -0,0 +1,70 @@
+"""pytest configuration; points the application at the test database before any test runs.
+
+Tests may be spread across processes with pytest-xdist (`pytest -n auto`); each worker then
+uses its own database, named after the worker (e.g. `fictionsource-test-gw0`), which is created
+on first use by copying `fictionsource-test` when that database exists.
+"""
+
+from os import environ
+from typing import Optional
+
+import pytest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import OperationalError
+
+from tests.helpers import use_test_database, TEST_DATABASE
+
+from app import app
+
+WORKER = environ.get("PYTEST_XDIST_WORKER")
+DATABASE = TEST_DATABASE if WORKER is None else f"{TEST_DATABASE}-{WORKER}"
+
+def create_database(uri: str, template: Optional[str] = None) -> None:
+    """Creates the database a URI refers to if it doesn't exist yet.
+
+    Parameters
+    ==========
+    uri: `str`
+        URI of the database to create.
+
+    template: `Optional[str]`
+        Name of an existing database to copy the new one from, if any. Cloning a database whose
+        schema has already been built is much faster than building it again; the copy is still
+        checked against the models before it is used. Defaults to None.
+    """
+
+    url = make_url(uri)
+    database = url.database
+    # connect to the maintenance database through a copy, leaving the test database's URL as is
+    admin_url = make_url(str(url))
+    admin_url.database = "postgres"
+
+    engine = create_engine(admin_url, isolation_level="AUTOCOMMIT")
+    quote = engine.dialect.identifier_preparer.quote
+    try:
+        query = text("SELECT 1 FROM pg_database WHERE datname = :database")
+        if engine.execute(query, database=database).scalar():
+            return
+
+        if template is not None and engine.execute(query, database=template).scalar():
+            try:
+                engine.execute(f"CREATE DATABASE {quote(database)} TEMPLATE {quote(template)}")
+                return
+            except OperationalError:
+                # the template can't be copied while anything else is connected to it
+                pass
+
+        engine.execute(f"CREATE DATABASE {quote(database)}")
+    finally:
+        engine.dispose()
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database() -> None:
+    """Points the application at this process' test database."""
+
+    use_test_database(database=DATABASE)
+
+    if WORKER is not None:
+        create_database(app.config['SQLALCHEMY_DATABASE_URI'], template=TEST_DATABASE)
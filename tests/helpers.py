@@ -0,0 +1,509 @@
+"""Fixtures & helpers shared by the test suites: fixture data, test client sessions & the test
+database's setup, isolation & seeding.
+"""
+
+# == IMPORTS ===================================================================================== #
+
+from flask.testing import FlaskClient
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import scoped_session, Session
+from sqlalchemy.orm.session import SessionTransaction
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models import Chapter, connect_db, db, RefImage, Story, User
+from dbcred import get_database_uri
+
+from datetime import date, datetime, timezone
+
+from unittest import TestCase
+
+from base64 import b64encode
+from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha256
+from typing import Iterator, List, Optional, Tuple, Type
+
+from app import CURR_USER_KEY, app
+
+# == FIXTURES ==================================================================================== #
+
+# bcrypt cost used by tests; production keeps Flask-Bcrypt's default of 12
+TEST_BCRYPT_ROUNDS = 4
+
+# precomputed bcrypt hashes (4 rounds) of "testpass" & "testuser"
+TESTPASS_HASH = "$2b$04$I7cAvltn/dWUMV4nWvY4muCYQn2dk.DDDcVj.oy8GyfLD.rnRLQD6"
+TESTUSER_HASH = "$2b$04$rC.hudVcuEswxIzI9cgA6uQl9lWh5apex6pfRpdTAfx1u1f1tB0vm"
+
+USERDATA = (
+    {
+        "username": "testuser",
+        "password": TESTPASS_HASH,
+        "description": None,
+        "email": "testuser@gmail.com",
+        "birthdate": date(1997, 3, 16),
+        "joined": datetime(2021, 1, 5, 11, 5, 9, 155000, timezone.utc),
+        "flags": User.Flags.ALLOW_RISQUE
+    },
+    {
+        "username": "testuser2",
+        "password": TESTPASS_HASH,
+        "description": None,
+        "email": "testuser2@gmail.com",
+        "birthdate": date(1997, 3, 17),
+        "joined": datetime(2021, 1, 12, 7, 12, 9, 363000, timezone.utc)
+    },
+    {
+        "username": "testuser3",
+        "password": TESTPASS_HASH,
+        "description": None,
+        "email": "testuser3@gmail.com",
+        "birthdate": date(1997, 3, 18),
+        "joined": datetime(2021, 1, 25, 3, 22, 18, 796000, timezone.utc),
+        "flags": User.Flags.ALLOW_RISQUE
+    }
+)
+
+STORYDATA = (
+    {
+        "title": "Test Story",
+        "summary": "This is a Simon test :^)",
+        "posted": datetime(2021, 2, 5, 15, 24, 11, 234000, timezone.utc),
+        "modified": datetime(2021, 2, 5, 15, 24, 11, 234000, timezone.utc),
+        "flags": Story.Flags.CAN_COMMENT
+    },
+    {
+        "title": "Test Story",
+        "summary": "This is a Simon test :^)",
+        "posted": datetime(2021, 2, 8, 11, 56, 11, 411000, timezone.utc),
+        "modified": datetime(2021, 2, 8, 11, 56, 11, 411000, timezone.utc),
+        "flags": Story.Flags.CAN_COMMENT | Story.Flags.PRIVATE
+    },
+    {
+        "title": "Unsafe for Work Story",
+        "summary": "How scandalous!! *shocked face*",
+        "posted": datetime(2021, 2, 9, 4, 24, 11, 911000, timezone.utc),
+        "modified": datetime(2021, 2, 9, 5, 11, 55, 911000, timezone.utc),
+        "flags": Story.Flags.IS_RISQUE
+    }
+)
+
+CHAPTERDATA1 = (
+    {
+        "name": None,
+        "text": "Hello **world**! I'm a test chapter's text contents! Wheeeeee",
+        "author_notes": "Just explainin what this is.",
+        "posted":   STORYDATA[0]['posted'],
+        "modified": STORYDATA[0]['modified'],
+        "flags": Chapter.Flags(0)
+    },
+    {
+        "name": "Chapter 2",
+        "text": "More text lol",
+        "author_notes": None,
+        "posted":   STORYDATA[0]['posted'],
+        "modified": STORYDATA[0]['modified'],
+        "flags": Chapter.Flags(0),
+        "index": 1
+    }
+)
+
+CHAPTERDATA2 = (
+    {
+        "name": None,
+        "text": "Hello",
+        "author_notes": None,
+        "posted":   STORYDATA[1]['posted'],
+        "modified": STORYDATA[1]['modified'],
+        "flags": Chapter.Flags(0),
+        "index": 1
+    },
+    {
+        "name": "Blank Chapter",
+        "text": "# \n**",
+        "author_notes": None,
+        "posted":   STORYDATA[1]['posted'],
+        "modified": STORYDATA[1]['modified'],
+        "index": 0
+    }
+)
+
+CHAPTERDATA3 = (
+    {
+        "name": None,
+        "text": "<insert risque content here lol>",
+        "author_notes": None,
+        "posted":   STORYDATA[2]['posted'],
+        "modified": STORYDATA[2]['modified'],
+        "flags": Chapter.Flags(0)
+    },
+    {
+        "name": "Private Chapter",
+        "text": "# Heading\n*Hello I have stuff in me yay*",
+        "author_notes": None,
+        "posted":   STORYDATA[2]['posted'],
+        "modified": STORYDATA[2]['modified'],
+        "index": 1
+    }
+)
+
+# == TEST CLIENTS ================================================================================ #
+
+@lru_cache(maxsize=64)
+def generate_basicauth_credentials(username: str, password: str) -> str:
+    """Generates Basic Authorization HTTP header data.
+    
+    Parameters
+    ==========
+    username: `str`
+        The username to log in with.
+
+    password: `str`
+        The password to log in with.
+
+    Returns
+    =======
+    `str`
+        String to place in as the value of an Authorization request header.
+    """
+
+    credentials = b64encode(bytes(f'{username}:{password}', 'utf-8'))
+    return "Basic " + credentials.decode('utf-8')
+
+@lru_cache(maxsize=16)
+def signed_session_cookie(user_id: int) -> str:
+    """Signs a Flask session cookie logging a user in, exactly as the app itself would.
+
+    Parameters
+    ==========
+    user_id: `int`
+        ID of the user to log in.
+
+    Returns
+    =======
+    `str`
+        Value of the session cookie.
+    """
+
+    return app.session_interface.get_signing_serializer(app).dumps({ CURR_USER_KEY: user_id })
+
+def set_session_user(client: FlaskClient, user_id: Optional[int]) -> None:
+    """Logs a user into (or out of) a test client's Flask session.
+
+    The session cookie is written directly rather than through `session_transaction()`, which
+    would load, verify, re-sign & save the whole session each time.
+
+    Parameters
+    ==========
+    client: `FlaskClient`
+        The test client whose session to modify.
+
+    user_id: `Optional[int]`
+        ID of the user to log in, or None to log out.
+    """
+
+    if user_id is None:
+        client.delete_cookie("localhost", app.session_cookie_name)
+    else:
+        client.set_cookie("localhost", app.session_cookie_name, signed_session_cookie(user_id))
+
+# == TEST DATABASE =============================================================================== #
+
+TEST_DATABASE = "fictionsource-test"
+
+@lru_cache(maxsize=8)
+def saved_test_database_uri(database: str) -> Optional[str]:
+    """Builds the URI of a test database from the credentials saved in .dbtestcred, falling back
+    to no credentials at all. The credentials file is only read once per database.
+
+    Parameters
+    ==========
+    database: `str`
+        Name of the test database.
+
+    Returns
+    =======
+    `Optional[str]`
+        The database's URI.
+    """
+
+    uri = get_database_uri(database, cred_file=".dbtestcred", save=False)
+    if uri is None:
+        uri = get_database_uri(database, cred_file=None, save=False)
+    return uri
+
+def use_test_database(
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    database: str = TEST_DATABASE
+) -> None:
+    """Points the application at a test database.
+
+    Parameters
+    ==========
+    username: `Optional[str]`
+        The database username to log in with, which is saved to .dbtestcred along with
+        password. Defaults to None, in which case the credentials saved in .dbtestcred are used
+        (or none at all, if there aren't any).
+
+    password: `Optional[str]`
+        The password associated with username. Defaults to None.
+
+    database: `str`
+        Name of the test database. Defaults to TEST_DATABASE.
+    """
+
+    if username is not None:
+        uri = get_database_uri(database, username, password, cred_file=".dbtestcred")
+    else:
+        uri = saved_test_database_uri(database)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ECHO'] = False
+
+SCHEMA_READY = False
+
+def clear_database() -> None:
+    """Empties every table of the test database, save for the default user image & story
+    thumbnail.
+    """
+
+    # every DELETE is sent in one round trip; images is last since other tables reference it
+    statements = [
+        f"DELETE FROM {table.name}"
+        for table in reversed(db.metadata.sorted_tables) if table is not RefImage.__table__
+    ]
+    statements.append(f"DELETE FROM {RefImage.__table__.name} WHERE id NOT IN (1, 2)")
+    db.session.execute("; ".join(statements))
+    db.session.commit()
+
+def schema_fingerprint() -> str:
+    """Hashes the DDL the models build the test database's schema with: every table, column type,
+    constraint & index, including the index options reflection can't read back.
+    """
+
+    dialect = db.engine.dialect
+    statements = sorted(
+        str(ddl.compile(dialect=dialect)) for table in db.metadata.sorted_tables
+        for ddl in (CreateTable(table), *map(CreateIndex, table.indexes))
+    )
+    return sha256("\n".join(statements).encode()).hexdigest()
+
+def schema_is_current() -> bool:
+    """Checks whether the test database's schema was built from the models as they are now, and
+    still holds the default user image & story thumbnail.
+    """
+
+    # the fingerprint is kept as the images table's comment, so drop_all discards it too
+    built_from = db.session.execute(
+        text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+        { "table": RefImage.__tablename__ }
+    ).scalar()
+    if built_from != schema_fingerprint():
+        return False
+
+    return RefImage.query.filter(RefImage.id.in_((1, 2))).count() == 2
+
+def prepare_database() -> None:
+    """Connects the test application to its database, then builds the schema along with the
+    default user image & story thumbnail.
+
+    The application is only connected & the schema only built once per process; subsequent
+    calls empty every table instead. A schema left over from a previous run is reused when the
+    models haven't changed since it was built; anything else rebuilds it.
+    """
+
+    global SCHEMA_READY
+
+    if SCHEMA_READY:
+        clear_database()
+        return
+
+    app.config['BCRYPT_LOG_ROUNDS'] = TEST_BCRYPT_ROUNDS
+    # FLASK_DEBUG would otherwise have every query recorded & every JSON response pretty-printed
+    app.config['DEBUG'] = False
+    # test data never needs to survive a crash, so don't wait on WAL flushes when committing
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        "connect_args": { "options": "-c synchronous_commit=off" }
+    }
+    connect_db(app)
+
+    if schema_is_current():
+        # restart IDs too, so IDs the tests expect to be nonexistant stay that way
+        tables = ", ".join(
+            table.name for table in db.metadata.sorted_tables if table is not RefImage.__table__
+        )
+        db.session.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        db.session.execute(RefImage.__table__.delete().where(~RefImage.id.in_((1, 2))))
+    else:
+        db.session.rollback()
+        db.drop_all()
+        db.create_all()
+        db.session.execute(
+            f"COMMENT ON TABLE {RefImage.__tablename__} IS '{schema_fingerprint()}'"
+        )
+
+        db.session.add_all((
+            RefImage(_url=User.DEFAULT_IMAGE_URI),
+            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
+        ))
+    db.session.commit()
+
+    SCHEMA_READY = True
+
+DEFAULT_SESSION = db.session
+
+def bind_session(connection: Connection) -> None:
+    """Replaces the database session with one bound to the given connection.
+
+    Follows SQLAlchemy's recipe for joining a session into an external transaction: every session
+    begins inside of a SAVEPOINT that is restarted whenever it's committed or rolled back, so
+    routes & models can commit freely without ending the connection's transaction. Flask still
+    removes the session at the end of every request; the next one begins a SAVEPOINT of its own.
+
+    Parameters
+    ==========
+    connection: `Connection`
+        An open connection with a transaction in progress.
+    """
+
+    factory = db.create_session({ "bind": connection, "binds": {} })
+
+    @event.listens_for(factory, "after_transaction_end")
+    def restart_savepoint(session: Session, transaction: SessionTransaction) -> None:
+        if transaction.nested and not transaction._parent.nested:
+            session.expire_all()
+            session.begin_nested()
+
+    def begin_session() -> Session:
+        session = factory()
+        session.begin_nested()
+        return session
+
+    db.session = scoped_session(begin_session)
+
+def unbind_session(keep: bool = False) -> None:
+    """Restores the database session replaced by `bind_session`, ending its SAVEPOINT.
+
+    Parameters
+    ==========
+    keep: `bool`
+        Whether to release the SAVEPOINT, keeping everything done through the session in the
+        connection's transaction, rather than rolling it back. Defaults to False.
+    """
+
+    session = db.session
+    db.session = DEFAULT_SESSION
+
+    transaction = session().transaction
+    if keep:
+        transaction.commit()
+    else:
+        transaction.rollback()
+    session.remove()
+
+def begin_class_transaction(test_class: Type[TestCase]) -> None:
+    """Opens the connection & transaction a test class' fixtures are kept in, as its `connection`
+    & `transaction` attributes.
+
+    Both are ended by class cleanups rather than `tearDownClass`, since cleanups still run when
+    `setUpClass` fails partway through; a half-seeded class would otherwise leave its transaction
+    open, blocking every later class that inserts the same rows.
+
+    Parameters
+    ==========
+    test_class: `Type[TestCase]`
+        The test class, from its `setUpClass`.
+    """
+
+    test_class.connection = db.engine.connect()
+    test_class.addClassCleanup(test_class.connection.close)
+
+    test_class.transaction = test_class.connection.begin()
+    test_class.addClassCleanup(test_class.transaction.rollback)
+
+    def unbind_leftover_session() -> None:
+        # still bound if seeding fixtures or a test's setUp failed
+        if db.session is not DEFAULT_SESSION:
+            unbind_session()
+
+    test_class.addClassCleanup(unbind_leftover_session)
+
+@contextmanager
+def count_queries(connection: Connection) -> Iterator[List[str]]:
+    """Records every statement sent through a connection for the duration of a `with` block.
+
+    Parameters
+    ==========
+    connection: `Connection`
+        The connection to watch, e.g. the one a session was bound to with `bind_session`.
+
+    Returns
+    =======
+    `Iterator[List[str]]`
+        A context manager yielding the list the statements are appended to.
+    """
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+def seed_users(connection: Connection) -> List[int]:
+    """Inserts the USERDATA fixtures.
+
+    Parameters
+    ==========
+    connection: `Connection`
+        The connection to insert the fixtures through.
+
+    Returns
+    =======
+    `List[int]`
+        The IDs of the inserted users, in fixture order.
+    """
+
+    return [ id for (id,) in connection.execute(
+        User.__table__.insert().values(list(USERDATA)).returning(User.__table__.c.id)
+    ) ]
+
+def seed_fixtures(connection: Connection) -> Tuple[List[int], List[int], List[int]]:
+    """Inserts the USERDATA, STORYDATA & CHAPTERDATA fixtures, with each story written by the
+    user at the same position and each CHAPTERDATA tuple belonging to the story at its position.
+
+    Parameters
+    ==========
+    connection: `Connection`
+        The connection to insert the fixtures through.
+
+    Returns
+    =======
+    `Tuple[List[int], List[int], List[int]]`
+        The IDs of the inserted users, stories & chapters, in fixture order.
+    """
+
+    user_ids = seed_users(connection)
+
+    story_ids = [ id for (id,) in connection.execute(
+        Story.__table__.insert().values([
+            { **data, "author_id": author_id }
+            for data, author_id in zip(STORYDATA, user_ids)
+        ]).returning(Story.__table__.c.id)
+    ) ]
+
+    chapter_ids = [ id for (id,) in connection.execute(
+        Chapter.__table__.insert().values([
+            { **data, "story_id": story_id }
+            for story_id, chapters in zip(story_ids, (CHAPTERDATA1, CHAPTERDATA2, CHAPTERDATA3))
+            for data in chapters
+        ]).returning(Chapter.__table__.c.id)
+    ) ]
+
+    return user_ids, story_ids, chapter_ids
@@ -6,15 +6,25 @@ from unittest import TestCase, main
 
 from flask.wrappers import Response
 
-from models import Chapter, connect_db, db, from_timestamp, RefImage, Story, User
-from dbcred import get_database_uri
+from typing import Optional
 
-from tests.test_api import USERDATA, STORYDATA, CHAPTERDATA1, CHAPTERDATA2, CHAPTERDATA3
+from models import Chapter, JSONType, to_timestamp, User
 
-from app import app, CURR_USER_KEY
+from tests.helpers import (
+    begin_class_transaction, bind_session, prepare_database, seed_fixtures, set_session_user,
+    unbind_session, use_test_database, CHAPTERDATA1, CHAPTERDATA2, CHAPTERDATA3
+)
+
+from app import app
 
 # == TEST CASE =================================================================================== #
 
+# JavaScript timestamps the API reports for the first chapters of CHAPTERDATA1 & CHAPTERDATA2
+CHAPTERDATA1_POSTED   = to_timestamp(CHAPTERDATA1[0]['posted'])
+CHAPTERDATA1_MODIFIED = to_timestamp(CHAPTERDATA1[0]['modified'])
+CHAPTERDATA2_POSTED   = to_timestamp(CHAPTERDATA2[0]['posted'])
+CHAPTERDATA2_MODIFIED = to_timestamp(CHAPTERDATA2[0]['modified'])
+
 class ChapterAPITestCase(TestCase):
     """Test cases for Chapter API entrypoints."""
 
@@ -22,143 +32,91 @@ class ChapterAPITestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
-
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
-
-    def setUp(self) -> None:
-        super().setUp()
+        prepare_database()
 
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        begin_class_transaction(cls)
 
-        Chapter.query.delete()
-        Story.query.delete()
-        User.query.delete()
+        cls.user_ids, cls.story_ids, cls.chapter_ids = seed_fixtures(cls.connection)
 
-        users = [ User(**data) for data in USERDATA ]
-        db.session.add_all(users)
-        db.session.commit()
-        self.user_ids = [ id for id in map(lambda user: user.id, users) ]
+        cls.client = app.test_client()
 
-        stories = [
-            Story(**STORYDATA[i], author_id=self.user_ids[i]) for i in range(len(STORYDATA))
-        ]
-        db.session.add_all(stories)
-        db.session.commit()
-        self.story_ids = [ id for id in map(lambda story: story.id, stories) ]
+    def setUp(self) -> None:
+        super().setUp()
 
-        chapters =  [ Chapter(**data, story_id=self.story_ids[0]) for data in CHAPTERDATA1 ]
-        chapters += [ Chapter(**data, story_id=self.story_ids[1]) for data in CHAPTERDATA2 ]
-        chapters += [ Chapter(**data, story_id=self.story_ids[2]) for data in CHAPTERDATA3 ]
-        db.session.add_all(chapters)
-        db.session.commit()
-        self.chapter_ids = [ id for id in map(lambda chapter: chapter.id, chapters) ]
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
 
-        self.client = app.test_client()
+        self.client.cookie_jar.clear()
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
         
     def test_get(self) -> None:
         """Tests retrieving a chapter's information."""
 
-        # nonexistant chapter request
-        response: Response = self.client.get("/api/chapter/1444")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        # anonymous/unprivileged chapter data request on public chapter
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[0]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.chapter_ids[0])
-        self.assertEqual(data['story'], self.story_ids[0])
-        self.assertEqual(data['name'], CHAPTERDATA1[0]['name'])
-        self.assertEqual(data['text'], CHAPTERDATA1[0]['text'])
-        self.assertEqual(data['author_notes'], CHAPTERDATA1[0]['author_notes'])
-        self.assertEqual(from_timestamp(data['posted']), CHAPTERDATA1[0]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), CHAPTERDATA1[0]['modified'])
-        self.assertEqual(data['comments'], [])
-        self.assertIsNone(data['previous'])
-        self.assertEqual(data['next'], self.chapter_ids[1])
-        self.assertEqual(data['number'], 1)
-        self.assertNotIn('private', data)
-        self.assertNotIn('index', data)
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
-
-        # anonymous/unprivileged chapter data request on private story
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[2]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[2]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
-
-        # anonymous/unprivileged/filtered chapter data request on private chapter
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[5]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
-
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[5]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
-        
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[5]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid chapter ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
-
-        # privileged chapter data request
-        response = self.client.get(f"/api/chapter/{self.chapter_ids[2]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.chapter_ids[2])
-        self.assertEqual(data['story'], self.story_ids[1])
-        self.assertEqual(data['name'], CHAPTERDATA2[0]['name'])
-        self.assertEqual(data['text'], CHAPTERDATA2[0]['text'])
-        self.assertEqual(data['author_notes'], CHAPTERDATA2[0]['author_notes'])
-        self.assertEqual(from_timestamp(data['posted']), CHAPTERDATA2[0]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), CHAPTERDATA2[0]['modified'])
-        self.assertEqual(data['comments'], [])
-        self.assertIsNone(data['previous'])
-        self.assertIsNone(data['next'])
-        self.assertIsNone(data['number'])
-        self.assertEqual(data['private'], CHAPTERDATA2[0]['flags'] & Chapter.Flags.PRIVATE > 0)
-        self.assertEqual(data['index'], CHAPTERDATA2[0]['index'])
+        with self.client as client:
+            # nonexistant chapter, private story & private/filtered chapter requests
+            for user_id, chapter_id in (
+                (None,             1444),
+                (self.user_ids[2], self.chapter_ids[2]),
+                (None,             self.chapter_ids[2]),
+                (self.user_ids[0], self.chapter_ids[5]),
+                (self.user_ids[1], self.chapter_ids[5]),
+                (None,             self.chapter_ids[5])
+            ):
+                with self.subTest(user_id=user_id, chapter_id=chapter_id):
+                    set_session_user(client, user_id)
+                    response: Response = client.get(f"/api/chapter/{chapter_id}")
+                    self.assertEqual(response.json['code'], 404)
+                    self.assertEqual(response.json['type'], 'error')
+                    self.assertIn("Invalid chapter ID.", response.json['errors'])
+
+            set_session_user(client, None)
+
+            # anonymous/unprivileged chapter data request on public chapter
+            response = client.get(f"/api/chapter/{self.chapter_ids[0]}")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+
+            data = response.json['data']
+            self.assertEqual(data['id'], self.chapter_ids[0])
+            self.assertEqual(data['story'], self.story_ids[0])
+            self.assertEqual(data['name'], CHAPTERDATA1[0]['name'])
+            self.assertEqual(data['text'], CHAPTERDATA1[0]['text'])
+            self.assertEqual(data['author_notes'], CHAPTERDATA1[0]['author_notes'])
+            self.assertEqual(data['posted'], CHAPTERDATA1_POSTED)
+            self.assertEqual(data['modified'], CHAPTERDATA1_MODIFIED)
+            self.assertEqual(data['comments'], [])
+            self.assertIsNone(data['previous'])
+            self.assertEqual(data['next'], self.chapter_ids[1])
+            self.assertEqual(data['number'], 1)
+            self.assertNotIn('private', data)
+            self.assertNotIn('index', data)
+
+            set_session_user(client, self.user_ids[1])
+
+            # privileged chapter data request
+            response = client.get(f"/api/chapter/{self.chapter_ids[2]}")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+
+            data = response.json['data']
+            self.assertEqual(data['id'], self.chapter_ids[2])
+            self.assertEqual(data['story'], self.story_ids[1])
+            self.assertEqual(data['name'], CHAPTERDATA2[0]['name'])
+            self.assertEqual(data['text'], CHAPTERDATA2[0]['text'])
+            self.assertEqual(data['author_notes'], CHAPTERDATA2[0]['author_notes'])
+            self.assertEqual(data['posted'], CHAPTERDATA2_POSTED)
+            self.assertEqual(data['modified'], CHAPTERDATA2_MODIFIED)
+            self.assertEqual(data['comments'], [])
+            self.assertIsNone(data['previous'])
+            self.assertIsNone(data['next'])
+            self.assertIsNone(data['number'])
+            self.assertEqual(data['private'], CHAPTERDATA2[0]['flags'] & Chapter.Flags.PRIVATE > 0)
+            self.assertEqual(data['index'], CHAPTERDATA2[0]['index'])
 
     def test_new(self) -> None:
         """Tests creating a new chapter."""
@@ -170,8 +128,7 @@ class ChapterAPITestCase(TestCase):
             self.assertEqual(response.json['type'], 'error')
             self.assertIn("Must be logged in to create a new chapter.", response.json['errors'])
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
         
         # unprivleged chapter post request on non-existant story
         response: Response = self.client.post("/api/story/1447/chapters")
@@ -277,116 +234,86 @@ class ChapterAPITestCase(TestCase):
     def test_list_chapters(self) -> None:
         """Tests listing a story's chapters."""
 
-        # chapter list request on nonexistant story
-        response: Response = self.client.get("/api/story/1447/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        def chapter_json(chapter_id: int, user_id: Optional[int] = None) -> JSONType:
+            user = None if user_id is None else User.query.get(user_id)
+            return Chapter.query.get(chapter_id).to_json(user)
+
+        with self.client as client:
+            # chapter list request on nonexistant, private & filtered stories
+            for user_id, story_id in (
+                (None,             1447),
+                (self.user_ids[0], 1447),
+                (None,             self.story_ids[1]),
+                (self.user_ids[0], self.story_ids[1]),
+                (None,             self.story_ids[2]),
+                (self.user_ids[1], self.story_ids[2])
+            ):
+                with self.subTest(user_id=user_id, story_id=story_id):
+                    set_session_user(client, user_id)
+                    response: Response = client.get(f"/api/story/{story_id}/chapters")
+                    self.assertEqual(response.json['code'], 404)
+                    self.assertEqual(response.json['type'], 'error')
+                    self.assertIn("Invalid story ID.", response.json['errors'])
+
+            set_session_user(client, None)
         
-        response = self.client.get("/api/story/1447/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
-
-        # chapter list request on private story
-        response = self.client.get(f"/api/story/{self.story_ids[1]}/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
-        
-        response = self.client.get(f"/api/story/{self.story_ids[1]}/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
-
-        # chapter list request on filtered story
-        response = self.client.get(f"/api/story/{self.story_ids[2]}/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
-        
-        response = self.client.get(f"/api/story/{self.story_ids[2]}/chapters")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
-
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
-        
-        # chapter list request
-        response = self.client.get(f"/api/story/{self.story_ids[0]}/chapters")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(len(response.json['data']), len(CHAPTERDATA1))
-        self.assertEqual(
-            response.json['data'][0],
-            self.client.get(f"/api/chapter/{self.chapter_ids[0]}").json['data']
-        )
-        self.assertEqual(
-            response.json['data'][1],
-            self.client.get(f"/api/chapter/{self.chapter_ids[1]}").json['data']
-        )
+            # chapter list request
+            response = client.get(f"/api/story/{self.story_ids[0]}/chapters")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+            self.assertEqual(len(response.json['data']), len(CHAPTERDATA1))
+            self.assertEqual(
+                response.json['data'][0],
+                chapter_json(self.chapter_ids[0])
+            )
+            self.assertEqual(
+                response.json['data'][1],
+                chapter_json(self.chapter_ids[1])
+            )
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+            set_session_user(client, self.user_ids[0])
         
-        response = self.client.get(f"/api/story/{self.story_ids[0]}/chapters")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(len(response.json['data']), len(CHAPTERDATA1))
-        self.assertEqual(
-            response.json['data'][0],
-            self.client.get(f"/api/chapter/{self.chapter_ids[0]}").json['data']
-        )
-        self.assertEqual(
-            response.json['data'][1],
-            self.client.get(f"/api/chapter/{self.chapter_ids[1]}").json['data']
-        )
+            response = client.get(f"/api/story/{self.story_ids[0]}/chapters")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+            self.assertEqual(len(response.json['data']), len(CHAPTERDATA1))
+            self.assertEqual(
+                response.json['data'][0],
+                chapter_json(self.chapter_ids[0], self.user_ids[0])
+            )
+            self.assertEqual(
+                response.json['data'][1],
+                chapter_json(self.chapter_ids[1], self.user_ids[0])
+            )
 
-        # unprivleged chapter list request on story with private chapters
-        response = self.client.get(f"/api/story/{self.story_ids[2]}/chapters")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(len(response.json['data']), len([ x for x in filter(
-            lambda x: x['flags'] & Chapter.Flags.PRIVATE == 0 if 'flags' in x else False,
-            CHAPTERDATA3
-        ) ]))
-        self.assertEqual(
-            response.json['data'][0],
-            self.client.get(f"/api/chapter/{self.chapter_ids[4]}").json['data']
-        )
+            # unprivleged chapter list request on story with private chapters
+            response = client.get(f"/api/story/{self.story_ids[2]}/chapters")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+            self.assertEqual(len(response.json['data']), len([ x for x in filter(
+                lambda x: x['flags'] & Chapter.Flags.PRIVATE == 0 if 'flags' in x else False,
+                CHAPTERDATA3
+            ) ]))
+            self.assertEqual(
+                response.json['data'][0],
+                chapter_json(self.chapter_ids[4], self.user_ids[0])
+            )
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
+            set_session_user(client, self.user_ids[2])
 
-        # privleged chapter list request on story with private chapters
-        response = self.client.get(f"/api/story/{self.story_ids[2]}/chapters")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(len(response.json['data']), len(CHAPTERDATA3))
-        self.assertEqual(
-            response.json['data'][0],
-            self.client.get(f"/api/chapter/{self.chapter_ids[4]}").json['data']
-        )
-        self.assertEqual(
-            response.json['data'][1],
-            self.client.get(f"/api/chapter/{self.chapter_ids[5]}").json['data']
-        )
+            # privleged chapter list request on story with private chapters
+            response = client.get(f"/api/story/{self.story_ids[2]}/chapters")
+            self.assertEqual(response.json['code'], 200)
+            self.assertEqual(response.json['type'], 'success')
+            self.assertEqual(len(response.json['data']), len(CHAPTERDATA3))
+            self.assertEqual(
+                response.json['data'][0],
+                chapter_json(self.chapter_ids[4], self.user_ids[2])
+            )
+            self.assertEqual(
+                response.json['data'][1],
+                chapter_json(self.chapter_ids[5], self.user_ids[2])
+            )
 
     def test_patch(self) -> None:
         """Tests modifying an existing chapter."""
@@ -401,8 +328,7 @@ class ChapterAPITestCase(TestCase):
                 response.json['errors']
             )
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # unprivleged chapter edit request for private chapter
         response = self.client.patch(f"/api/chapter/{self.chapter_ids[2]}")
@@ -516,8 +442,7 @@ class ChapterAPITestCase(TestCase):
                 "Must be logged in to delete an existing chapter.", response.json['errors']
             )
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # unprivleged chapter delete request for private chapter
         response = self.client.delete(f"/api/chapter/{self.chapter_ids[2]}")
@@ -552,27 +477,6 @@ class ChapterAPITestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
@@ -4,12 +4,14 @@
 
 from unittest import TestCase, main
 
-from models import Chapter, connect_db, db, RefImage, Story, User
-from dbcred import get_database_uri
+from models import Chapter, db, Story, User
 
 from datetime import date
 
-from app import app
+from tests.helpers import (
+    begin_class_transaction, bind_session, count_queries, prepare_database, unbind_session,
+    use_test_database
+)
 
 # == TEST CASE =================================================================================== #
 
@@ -20,75 +22,66 @@ class ChapterModelTestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
+        prepare_database()
 
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
-
-    def setUp(self) -> None:
-        super().setUp()
-
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        begin_class_transaction(cls)
 
-        Chapter.query.delete()
-        Story.query.delete()
-        User.query.delete()
+        # fixtures are created once & kept for the whole class by its outer transaction
+        bind_session(cls.connection)
 
-        self.testuser = User.register(
+        testuser = User.register(
             username = 'testuser',
             password = 'testuser',
             email = 'testuser@gmail.com',
             birthdate = date(1997, 3, 16)
         )
-        self.testuser.allow_risque = True
+        testuser.allow_risque = True
 
-        self.testuser2 = User.register(
+        testuser2 = User.register(
             username = 'testuser2',
             password = 'testuser2',
             email = 'testuser2@gmail.com',
             birthdate = date(1997, 3, 17)
         )
 
-        self.teststory = Story.new(self.testuser, "test")
+        teststory = Story.new(testuser, "test")
+
+        cls.testuser_id, cls.testuser2_id, cls.teststory_id = (
+            testuser.id, testuser2.id, teststory.id
+        )
+
+        unbind_session(keep=True)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
 
-        self.client = app.test_client()
+        self.testuser = User.query.get(self.testuser_id)
+        self.testuser2 = User.query.get(self.testuser2_id)
+        self.teststory = Story.query.get(self.teststory_id)
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
         
     def test_new(self) -> None:
         """Tests the Chapter.new class method."""
 
-        # name must be a string with at least one non-whitespace character or null
-        self.assertRaises(ValueError, Chapter.new, self.teststory, 1.5)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, True)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, -5)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, [])
-        self.assertRaises(ValueError, Chapter.new, self.teststory, {})
-        self.assertRaises(ValueError, Chapter.new, self.teststory, "")
-        self.assertRaises(ValueError, Chapter.new, self.teststory, " ")
-
-        # text must be a string
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = None)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = 125)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = False)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = -6.28)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = [])
-        self.assertRaises(ValueError, Chapter.new, self.teststory, text = {})
-
-        # author_notes must be a string or null
-        self.assertRaises(ValueError, Chapter.new, self.teststory, author_notes = 3.6)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, author_notes = True)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, author_notes = 1)
-        self.assertRaises(ValueError, Chapter.new, self.teststory, author_notes = [])
-        self.assertRaises(ValueError, Chapter.new, self.teststory, author_notes = {})
+        for field, values in (
+            # name must be a string with at least one non-whitespace character or null
+            ("name", (1.5, True, -5, [], {}, "", " ")),
+            # text must be a string
+            ("text", (None, 125, False, -6.28, [], {})),
+            # author_notes must be a string or null
+            ("author_notes", (3.6, True, 1, [], {}))
+        ):
+            for value in values:
+                with self.subTest(**{ field: value }):
+                    self.assertRaises(ValueError, Chapter.new, self.teststory, **{ field: value })
 
         chapter1 = Chapter.new(self.teststory)
         self.assertEqual(chapter1.story_id, self.teststory.id)
@@ -180,32 +173,37 @@ class ChapterModelTestCase(TestCase):
         chapter1.private = False
         chapter3.private = False
 
-        self.assertIsNone(chapter1.previous)
-        self.assertEqual(chapter1.next, chapter3)
-        self.assertEqual(chapter1.number, 1)
-
-        # private chapters aren't given an order, previous, or next; they're used solely
-        # for public chapter navigation
-        self.assertIsNone(chapter2.previous)
-        self.assertIsNone(chapter2.next)
-        self.assertIsNone(chapter2.number)
-
-        self.assertEqual(chapter3.previous, chapter1)
-        self.assertIsNone(chapter3.next)
-        self.assertEqual(chapter3.number, 2)
-
-        # private stories don't have a public ordering for chapters
-        self.teststory.private = True
-
-        self.assertIsNone(chapter1.previous)
-        self.assertIsNone(chapter1.next)
-        self.assertIsNone(chapter1.number)
-        self.assertIsNone(chapter2.previous)
-        self.assertIsNone(chapter2.next)
-        self.assertIsNone(chapter2.number)
-        self.assertIsNone(chapter3.previous)
-        self.assertIsNone(chapter3.next)
-        self.assertIsNone(chapter3.number)
+        with count_queries(self.connection) as statements:
+            self.assertIsNone(chapter1.previous)
+            self.assertEqual(chapter1.next, chapter3)
+            self.assertEqual(chapter1.number, 1)
+
+            # private chapters aren't given an order, previous, or next; they're used solely
+            # for public chapter navigation
+            self.assertIsNone(chapter2.previous)
+            self.assertIsNone(chapter2.next)
+            self.assertIsNone(chapter2.number)
+
+            self.assertEqual(chapter3.previous, chapter1)
+            self.assertIsNone(chapter3.next)
+            self.assertEqual(chapter3.number, 2)
+
+            # private stories don't have a public ordering for chapters
+            self.teststory.private = True
+
+            self.assertIsNone(chapter1.previous)
+            self.assertIsNone(chapter1.next)
+            self.assertIsNone(chapter1.number)
+            self.assertIsNone(chapter2.previous)
+            self.assertIsNone(chapter2.next)
+            self.assertIsNone(chapter2.number)
+            self.assertIsNone(chapter3.previous)
+            self.assertIsNone(chapter3.next)
+            self.assertIsNone(chapter3.number)
+
+        # story & chapter flags autoflushed (one UPDATE each) + the story's chapters, loaded once;
+        # every sibling lookup after that reuses them
+        self.assertLessEqual(len(statements), 2 + 1)
 
     def test_update(self) -> None:
         """Tests the Chapter.update method."""
@@ -343,26 +341,6 @@ class ChapterModelTestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
@@ -4,12 +4,13 @@
 
 from unittest import TestCase, main
 
-from models import connect_db, db, User, Story, Chapter, Comment
-from dbcred import get_database_uri
+from models import db, User, Story, Chapter, Comment
 
-from datetime import date, timedelta
+from datetime import date
 
-from app import app
+from tests.helpers import (
+    begin_class_transaction, bind_session, prepare_database, unbind_session, use_test_database
+)
 
 # == TEST CASE =================================================================================== #
 
@@ -20,57 +21,68 @@ class CommentModelTestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
+        prepare_database()
 
-    def setUp(self) -> None:
-        super().setUp()
+        begin_class_transaction(cls)
 
-        db.drop_all()
-        db.create_all()
+        # fixtures are created once & kept for the whole class by its outer transaction
+        bind_session(cls.connection)
 
-        self.testuser = User.register(
+        testuser = User.register(
             username = 'testuser',
             password = 'testuser',
             email = 'testuser@gmail.com',
             birthdate = date(1997, 3, 16)
         )
-        self.testuser.allow_risque = True
+        testuser.allow_risque = True
 
-        self.testuser2 = User.register(
+        testuser2 = User.register(
             username = 'testuser2',
             password = 'testuser2',
             email = 'testuser2@gmail.com',
             birthdate = date(1997, 3, 17)
         )
 
-        self.teststory = Story.new(self.testuser, "Hello world")
-        self.testchapter = Chapter.new(self.teststory, None, "This is a test from Speakonia")
-        self.testchapter.private = False
-        db.session.commit()
+        teststory = Story.new(testuser, "Hello world")
+        testchapter = Chapter.new(teststory, None, "This is a test from Speakonia")
+        testchapter.private = False
+        db.session.flush()
+
+        cls.testuser_id, cls.testuser2_id, cls.teststory_id, cls.testchapter_id = (
+            testuser.id, testuser2.id, teststory.id, testchapter.id
+        )
+
+        unbind_session(keep=True)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
+
+        self.testuser = User.query.get(self.testuser_id)
+        self.testuser2 = User.query.get(self.testuser2_id)
+        self.teststory = Story.query.get(self.teststory_id)
+        self.testchapter = Chapter.query.get(self.testchapter_id)
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
 
     def test_new(self) -> None:
         """Tests the Comment.new class method."""
 
         # text must be non-whitespace string post-parse
-        self.assertRaises(ValueError, Comment.new, self.testuser, None, self.testchapter)
-        self.assertRaises(ValueError, Comment.new, self.testuser, 123, self.testchapter)
-        self.assertRaises(ValueError, Comment.new, self.testuser, 0.66, self.testchapter)
-        self.assertRaises(ValueError, Comment.new, self.testuser, [], self.testchapter)
-        self.assertRaises(ValueError, Comment.new, self.testuser, "", self.testchapter)
-        self.assertRaises(ValueError, Comment.new, self.testuser, "   \t ", self.testchapter)
-        self.assertRaises(ValueError,
-            Comment.new,
-            self.testuser, "![a](b)\n- - -", self.testchapter
-        )
+        for text in (None, 123, 0.66, [], "", "   \t ", "![a](b)\n- - -"):
+            with self.subTest(text=text):
+                self.assertRaises(ValueError, Comment.new, self.testuser, text, self.testchapter)
 
         # of must be Chapter or Comment
-        self.assertRaises(ValueError, Comment.new, self.testuser, "test", None)
-        self.assertRaises(ValueError, Comment.new, self.testuser, "test", 123)
-        self.assertRaises(ValueError, Comment.new, self.testuser, "test", self.testuser2)
+        for of in (None, 123, self.testuser2):
+            with self.subTest(of=of):
+                self.assertRaises(ValueError, Comment.new, self.testuser, "test", of)
 
         comment = Comment.new(self.testuser, "test", self.testchapter)
         self.assertIn(comment, self.testchapter.comments)
@@ -118,33 +130,13 @@ class CommentModelTestCase(TestCase):
         self.assertEqual(comment.text, "ABCDEFG")
         self.assertGreater(comment.modified, comment.posted)
         
-        modified = comment.modified + timedelta(seconds=0)
+        modified = comment.modified
         self.assertEqual(len(comment.update(text="ABCDEFG")), 0)
         self.assertEqual(comment.text, "ABCDEFG")
         self.assertEqual(comment.modified, modified)
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
@@ -4,19 +4,40 @@
 
 from unittest import TestCase, main
 
+from typing import Any, List
+
 from flask.wrappers import Response
 
-from models import (
-    Chapter, connect_db, db, FavoriteStory, FollowingStory, from_timestamp, RefImage, Story, User
-)
-from dbcred import get_database_uri
+from models import Story, to_timestamp
 
-from tests.test_api import USERDATA, STORYDATA, CHAPTERDATA1, CHAPTERDATA2, CHAPTERDATA3
+from tests.helpers import (
+    begin_class_transaction, bind_session, prepare_database, seed_fixtures, set_session_user,
+    unbind_session, use_test_database, USERDATA, STORYDATA
+)
 
-from app import app, CURR_USER_KEY
+from app import app
 
 # == TEST CASE =================================================================================== #
 
+# user data list & past tense of each action tested by the favorite/follow tests
+STORY_ACTIONS = {
+    "favorite": ("favorite_stories", "favorited"),
+    "follow":   ("followed_stories", "followed")
+}
+
+# (posted, modified) timestamps of each story in STORYDATA, as the API returns them
+STORY_TIMESTAMPS = tuple(
+    (to_timestamp(story['posted']), to_timestamp(story['modified'])) for story in STORYDATA
+)
+
+class _NoBody:
+    """Stands in for the body of a request sent without one."""
+
+    def __repr__(self) -> str:
+        return "NO_BODY"
+
+NO_BODY = _NoBody()
+
 class StoryAPITestCase(TestCase):
     """Test cases for Story API entrypoints."""
 
@@ -24,241 +45,208 @@ class StoryAPITestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
-
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
-
-    def setUp(self) -> None:
-        super().setUp()
+        prepare_database()
 
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        begin_class_transaction(cls)
 
-        FavoriteStory.query.delete()
-        FollowingStory.query.delete()
-        Chapter.query.delete()
-        Story.query.delete()
-        User.query.delete()
+        cls.user_ids, cls.story_ids, cls.chapter_ids = seed_fixtures(cls.connection)
 
-        users = [ User(**data) for data in USERDATA ]
-        db.session.add_all(users)
-        db.session.commit()
-        self.user_ids = [ id for id in map(lambda user: user.id, users) ]
+        cls.client = app.test_client()
 
-        stories = [
-            Story(**STORYDATA[i], author_id=self.user_ids[i]) for i in range(len(STORYDATA))
-        ]
-        db.session.add_all(stories)
-        db.session.commit()
-        self.story_ids = [ id for id in map(lambda story: story.id, stories) ]
+    def setUp(self) -> None:
+        super().setUp()
 
-        chapters =  [ Chapter(**data, story_id=self.story_ids[0]) for data in CHAPTERDATA1 ]
-        chapters += [ Chapter(**data, story_id=self.story_ids[1]) for data in CHAPTERDATA2 ]
-        chapters += [ Chapter(**data, story_id=self.story_ids[2]) for data in CHAPTERDATA3 ]
-        db.session.add_all(chapters)
-        db.session.commit()
-        self.chapter_ids = [ id for id in map(lambda chapter: chapter.id, chapters) ]
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
 
-        self.client = app.test_client()
+        self.client.cookie_jar.clear()
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
         
+    def _assert_error(self, response: Response, code: int, *errors: str) -> None:
+        """Checks that an API response is an error response listing specific errors.
+
+        Parameters
+        ==========
+        response: `Response`
+            The response to check.
+
+        code: `int`
+            The expected status code.
+
+        *errors: `str`
+            Error messages the response should list.
+        """
+
+        json = response.json
+        self.assertEqual(json['code'], code)
+        self.assertEqual(json['type'], 'error')
+        for error in errors:
+            self.assertIn(error, json['errors'])
+
+    def _assert_success(self, response: Response, code: int) -> Any:
+        """Checks that an API response is a success response.
+
+        Parameters
+        ==========
+        response: `Response`
+            The response to check.
+
+        code: `int`
+            The expected status code.
+
+        Returns
+        =======
+        `Any`
+            The response's data, if any.
+        """
+
+        json = response.json
+        self.assertEqual(json['code'], code)
+        self.assertEqual(json['type'], 'success')
+        return json.get('data')
+
+    def _assert_story_data(
+        self, data: dict, index: int, chapter_ids: List[int], owner: bool = False
+    ) -> None:
+        """Checks the data returned by the API for one of the test stories.
+
+        Parameters
+        ==========
+        data: `dict`
+            The story data to check.
+
+        index: `int`
+            Index of the story in `STORYDATA` & `self.story_ids`.
+
+        chapter_ids: `List[int]`
+            IDs of the chapters the story data should list, in order.
+
+        owner: `bool`
+            Whether the data was requested by the story's author, who is the only one shown the
+            story's private flag. Defaults to False.
+        """
+
+        story = STORYDATA[index]
+        flags = story['flags']
+        posted, modified = STORY_TIMESTAMPS[index]
+        for key, value in (
+            ('id',          self.story_ids[index]),
+            ('author',      USERDATA[index]['username']),
+            ('summary',     story['summary']),
+            ('thumbnail',   Story.DEFAULT_THUMBNAIL_URI),
+            ('posted',      posted),
+            ('modified',    modified),
+            ('chapters',    chapter_ids),
+            ('is_risque',   flags & Story.Flags.IS_RISQUE > 0),
+            ('can_comment', flags & Story.Flags.CAN_COMMENT > 0)
+        ):
+            self.assertEqual(data[key], value, key)
+
+        if owner:
+            self.assertEqual(data['private'], flags & Story.Flags.PRIVATE > 0)
+        else:
+            self.assertNotIn('private', data)
+
     def test_get(self):
         """Tests retrieving a public story's information."""
 
         # nonexistant story request
         response: Response = self.client.get("/api/story/1444")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # anonymous/unprivileged story data request on public story
         response = self.client.get(f"/api/story/{self.story_ids[0]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.story_ids[0])
-        self.assertEqual(data['author'], USERDATA[0]['username'])
-        self.assertEqual(data['summary'], STORYDATA[0]['summary'])
-        self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), STORYDATA[0]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), STORYDATA[0]['modified'])
-        self.assertEqual(data['chapters'], self.chapter_ids[0:2])
-        self.assertFalse(data['is_risque'])
-        self.assertTrue(data['can_comment'])
-        self.assertNotIn('private', data)
+        self._assert_story_data(self._assert_success(response, 200), 0, self.chapter_ids[0:2])
 
         # priviledged story data request on public story
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
         response = self.client.get(f"/api/story/{self.story_ids[0]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.story_ids[0])
-        self.assertEqual(data['author'], USERDATA[0]['username'])
-        self.assertEqual(data['summary'], STORYDATA[0]['summary'])
-        self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), STORYDATA[0]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), STORYDATA[0]['modified'])
-        self.assertEqual(data['chapters'], self.chapter_ids[0:2])
-        self.assertFalse(data['is_risque'])
-        self.assertTrue(data['can_comment'])
-        self.assertFalse(data['private'])
+        self._assert_story_data(
+            self._assert_success(response, 200), 0, self.chapter_ids[0:2], owner=True
+        )
 
         # anonymous/unprivileged story data request on private story
         response = self.client.get(f"/api/story/{self.story_ids[1]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
+        set_session_user(self.client, None)
         response = self.client.get(f"/api/story/{self.story_ids[1]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
 
         # priviledged story data request on private story
         response = self.client.get(f"/api/story/{self.story_ids[1]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.story_ids[1])
-        self.assertEqual(data['author'], USERDATA[1]['username'])
-        self.assertEqual(data['summary'], STORYDATA[1]['summary'])
-        self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), STORYDATA[1]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), STORYDATA[1]['modified'])
-        self.assertEqual(data['chapters'], [ self.chapter_ids[3], self.chapter_ids[2] ])
-        self.assertFalse(data['is_risque'])
-        self.assertTrue(data['can_comment'])
-        self.assertTrue(data['private'])
+        self._assert_story_data(
+            self._assert_success(response, 200), 1, [ self.chapter_ids[3], self.chapter_ids[2] ],
+            owner=True
+        )
 
         # anonymous/filtered story data request on risque story
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
+        set_session_user(self.client, None)
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # filtered story data request on risque story
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.story_ids[2])
-        self.assertEqual(data['author'], USERDATA[2]['username'])
-        self.assertEqual(data['summary'], STORYDATA[2]['summary'])
-        self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), STORYDATA[2]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), STORYDATA[2]['modified'])
-        self.assertEqual(data['chapters'], [ self.chapter_ids[4] ])
-        self.assertTrue(data['is_risque'])
-        self.assertFalse(data['can_comment'])
-        self.assertNotIn('private', data)
+        self._assert_story_data(self._assert_success(response, 200), 2, [ self.chapter_ids[4] ])
 
         # privileged story data request on risque story
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
+        set_session_user(self.client, self.user_ids[2])
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
-        self.assertEqual(data['id'], self.story_ids[2])
-        self.assertEqual(data['author'], USERDATA[2]['username'])
-        self.assertEqual(data['summary'], STORYDATA[2]['summary'])
-        self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), STORYDATA[2]['posted'])
-        self.assertEqual(from_timestamp(data['modified']), STORYDATA[2]['modified'])
-        self.assertEqual(data['chapters'], self.chapter_ids[4:6])
-        self.assertTrue(data['is_risque'])
-        self.assertFalse(data['can_comment'])
-        self.assertFalse(data['private'])
+        self._assert_story_data(
+            self._assert_success(response, 200), 2, self.chapter_ids[4:6], owner=True
+        )
 
     def test_post(self) -> None:
         """Tests creating a new story."""
 
         # unprivileged story create request
         response: Response = self.client.post("/api/story")
-        self.assertEqual(response.json['code'], 401)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Must be logged in to post a new story.", response.json['errors'])
+        self._assert_error(response, 401, "Must be logged in to post a new story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
         
         # privileged story create request with invalid body
-        response = self.client.post("/api/story", json="hello world")
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got string.", response.json['errors'])
-        
-        response = self.client.post("/api/story", json=144)
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got integer.", response.json['errors'])
-        
-        response = self.client.post("/api/story", json=["hello world", "make me a story dammit"])
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got list.", response.json['errors'])
-        
-        # privileged story create request with invalid parameters
-        response = self.client.post("/api/story", json={
-            "title": 12345,
-            "summary": [1, 2, 3]
-        })
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("'title' must be a string.", response.json['errors'])
-        self.assertIn("'summary' must be a string.", response.json['errors'])
-        
-        # privileged story create request with missing parameters
-        response = self.client.post("/api/story", json={
-            "title": "",
-            "thumbnail": 83
-        })
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(
-            "'title' must contain at least one non-whitespace character.",
-            response.json['errors']
-        )
-        self.assertIn("'thumbnail' must be a string.", response.json['errors'])
+        for body, type_name in (
+            ("hello world",                                "string"),
+            (144,                                          "integer"),
+            (["hello world", "make me a story dammit"],    "list")
+        ):
+            with self.subTest(body=body):
+                response = self.client.post("/api/story", json=body)
+                self._assert_error(response, 400, f"Expected object; got {type_name}.")
         
-        # privileged story create request with missing parameters
-        response = self.client.post("/api/story", json={
-            "thumbnail": False
-        })
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Missing parameter 'title'.", response.json['errors'])
-        self.assertIn("'thumbnail' must be a string.", response.json['errors'])
+        # privileged story create request with invalid/missing parameters
+        for body, errors in (
+            (
+                { "title": 12345, "summary": [1, 2, 3] },
+                ("'title' must be a string.", "'summary' must be a string.")
+            ),
+            (
+                { "title": "", "thumbnail": 83 },
+                (
+                    "'title' must contain at least one non-whitespace character.",
+                    "'thumbnail' must be a string."
+                )
+            ),
+            (
+                { "thumbnail": False },
+                ("Missing parameter 'title'.", "'thumbnail' must be a string.")
+            )
+        ):
+            with self.subTest(body=body):
+                response = self.client.post("/api/story", json=body)
+                self._assert_error(response, 400, *errors)
 
         # privileged story create request with correct parameters
         response = self.client.post("/api/story", json={
@@ -266,14 +254,11 @@ class StoryAPITestCase(TestCase):
             "summary": "A down-to-earth tale.",
             "thumbnail": "https://via.placeholder.com/150"
         })
-        self.assertEqual(response.json['code'], 201)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
+        data = self._assert_success(response, 201)
         self.assertEqual(data['author'], USERDATA[0]['username'])
         self.assertEqual(data['summary'], "A down-to-earth tale.")
         self.assertEqual(data['thumbnail'], "https://via.placeholder.com/150")
-        self.assertEqual(from_timestamp(data['posted']), from_timestamp(data['modified']))
+        self.assertEqual(data['posted'], data['modified'])
         self.assertEqual(data['chapters'], [])
         self.assertFalse(data['is_risque'])
         self.assertTrue(data['can_comment'])
@@ -281,23 +266,17 @@ class StoryAPITestCase(TestCase):
 
         # check if newly posted data matches data from get
         response = self.client.get(f"/api/story/{data['id']}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(response.json['data'], data)
+        self.assertEqual(self._assert_success(response, 200), data)
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
 
         # privileged story create request with default parameter fill-in
         response = self.client.post("/api/story", json={ "title": "A Fine Place" })
-        self.assertEqual(response.json['code'], 201)
-        self.assertEqual(response.json['type'], 'success')
-
-        data = response.json['data']
+        data = self._assert_success(response, 201)
         self.assertEqual(data['author'], USERDATA[1]['username'])
         self.assertEqual(data['summary'], "")
         self.assertEqual(data['thumbnail'], Story.DEFAULT_THUMBNAIL_URI)
-        self.assertEqual(from_timestamp(data['posted']), from_timestamp(data['modified']))
+        self.assertEqual(data['posted'], data['modified'])
         self.assertEqual(data['chapters'], [])
         self.assertFalse(data['is_risque'])
         self.assertTrue(data['can_comment'])
@@ -309,49 +288,34 @@ class StoryAPITestCase(TestCase):
         # anonymous story patch request
         for id in (self.story_ids[0], 1444):
             response = self.client.patch(f"/api/story/{id}")
-            self.assertEqual(response.json['code'], 401)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn("Must be logged in to update an existing story.", response.json['errors'])
+            self._assert_error(response, 401, "Must be logged in to update an existing story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # nonexistant story patch request
         response: Response = self.client.patch("/api/story/1444")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # unprivleged private story patch request
         response = self.client.patch(f"/api/story/{self.story_ids[1]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # unprivleged public story patch request
         response = self.client.patch(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 401)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Insufficient credentials.", response.json['errors'])
+        self._assert_error(response, 401, "Insufficient credentials.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
+        set_session_user(self.client, self.user_ids[2])
 
         # privleged story patch request with invalid body
-        response = self.client.patch(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got null.", response.json['errors'])
-        
-        response = self.client.patch(f"/api/story/{self.story_ids[2]}", json=55)
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got integer.", response.json['errors'])
-        
-        response = self.client.patch(f"/api/story/{self.story_ids[2]}", json=[1, 2])
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Expected object; got list.", response.json['errors'])
+        for body, expected_error in (
+            (NO_BODY, "Expected object; got null."),
+            (55,      "Expected object; got integer."),
+            ([1, 2],  "Expected object; got list.")
+        ):
+            with self.subTest(body=body):
+                request_args = {} if body is NO_BODY else { "json": body }
+                response = self.client.patch(f"/api/story/{self.story_ids[2]}", **request_args)
+                self._assert_error(response, 400, expected_error)
         
         # privileged story patch request with invalid parameters
         response = self.client.patch(f"/api/story/{self.story_ids[2]}", json={
@@ -359,11 +323,13 @@ class StoryAPITestCase(TestCase):
             "thumbnail": False,
             "can_comment": 1
         })
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("'title' must be a string.", response.json['errors'])
-        self.assertIn("'thumbnail' must be a string.", response.json['errors'])
-        self.assertIn("'can_comment' must be a boolean.", response.json['errors'])
+        self._assert_error(
+            response,
+            400,
+            "'title' must be a string.",
+            "'thumbnail' must be a string.",
+            "'can_comment' must be a boolean."
+        )
         
         response = self.client.patch(f"/api/story/{self.story_ids[2]}", json={
             "title": "   ",
@@ -371,45 +337,38 @@ class StoryAPITestCase(TestCase):
             "can_comment": "abc",
             "is_risque": 55
         })
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(
+        self._assert_error(
+            response,
+            400,
             "'title' must contain at least one non-whitespace character.",
-            response.json['errors']
+            "'can_comment' must be a boolean.",
+            "'is_risque' must be a boolean."
         )
-        self.assertIn("'can_comment' must be a boolean.", response.json['errors'])
-        self.assertIn("'is_risque' must be a boolean.", response.json['errors'])
-        self.assertTrue(all(map(lambda s: 'private' not in s, response.json['errors'])))
+        self.assertFalse(any('private' in error for error in response.json['errors']))
 
         # privileged story patch request with valid parameters
         response = self.client.patch(f"/api/story/{self.story_ids[2]}", json={
             "title": "Hello   world  ",
             "is_risque": False
         })
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
 
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(response.json['data']['title'], "Hello world")
-        self.assertEqual(response.json['data']['is_risque'], False)
+        data = self._assert_success(response, 200)
+        self.assertEqual(data['title'], "Hello world")
+        self.assertEqual(data['is_risque'], False)
 
         # privileged story patch request with attempt to modify is_risque for user
         # that filters out risque content
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
         
         response = self.client.patch(f"/api/story/{self.story_ids[1]}", json={
             "is_risque": True
         })
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
 
         response = self.client.get(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(response.json['data']['is_risque'], False)
+        self.assertEqual(self._assert_success(response, 200)['is_risque'], False)
 
     def test_delete(self) -> None:
         """Tests deleting an existing story."""
@@ -417,163 +376,110 @@ class StoryAPITestCase(TestCase):
         # anonymous story delete request
         for id in (self.story_ids[0], 1444):
             response = self.client.delete(f"/api/story/{id}")
-            self.assertEqual(response.json['code'], 401)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn(
-                "Must be logged in to delete an existing story.",
-                response.json['errors']
-            )
+            self._assert_error(response, 401, "Must be logged in to delete an existing story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # nonexistant story delete request
         response: Response = self.client.delete("/api/story/1444")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # unprivleged private story delete request
         response = self.client.delete(f"/api/story/{self.story_ids[1]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
         # unprivleged public story delete request
         response = self.client.delete(f"/api/story/{self.story_ids[2]}")
-        self.assertEqual(response.json['code'], 401)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Insufficient credentials.", response.json['errors'])
+        self._assert_error(response, 401, "Insufficient credentials.")
 
         # privleged story delete request
         response = self.client.delete(f"/api/story/{self.story_ids[0]}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
 
         response = self.client.get(f"/api/story/{self.story_ids[0]}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
     def _test_fav_fol_base(self, action: str = "favorite"):
         """Tests for favoriting/following a story."""
 
-        lst = "favorite_stories" if action == "favorite" else "followed_stories"
-        actioned = action + ('d' if action.endswith('e') else 'ed')
+        lst, actioned = STORY_ACTIONS[action]
 
         # anonymous story favorite request
         for id in (self.story_ids[0], 1444):
             response = self.client.post(f"/api/story/{id}/{action}")
-            self.assertEqual(response.json['code'], 401)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn(
-                f"Must be logged in to {action} a story.",
-                response.json['errors']
-            )
+            self._assert_error(response, 401, f"Must be logged in to {action} a story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # nonexistant/private story favorite request
         for id in (self.story_ids[1], 1444):
             response = self.client.post(f"/api/story/{id}/{action}")
-            self.assertEqual(response.json['code'], 404)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn("Invalid story ID.", response.json['errors'])
+            self._assert_error(response, 404, "Invalid story ID.")
         
         # story self-favorite request
         response: Response = self.client.post(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 403)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(f"Cannot {action} your own story.", response.json['errors'])
+        self._assert_error(response, 403, f"Cannot {action} your own story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
         
         # valid story favorite request
         response = self.client.post(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
 
         response = self.client.get(f"/api/user/{USERDATA[1]['username']}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertIn(self.story_ids[0], response.json['data'][lst])
-        self.assertNotIn(self.story_ids[1], response.json['data'][lst])
-        self.assertNotIn(self.story_ids[2], response.json['data'][lst])
+        stories = self._assert_success(response, 200)[lst]
+        self.assertIn(self.story_ids[0], stories)
+        self.assertNotIn(self.story_ids[1], stories)
+        self.assertNotIn(self.story_ids[2], stories)
 
         # story refavorite request
         response = self.client.post(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(f"You already {actioned} this story.", response.json['errors'])
+        self._assert_error(response, 400, f"You already {actioned} this story.")
 
         # risque story favorite request for filtered user
         response = self.client.post(f"/api/story/{self.story_ids[2]}/{action}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
     def _test_unfav_unfol_base(self, action: str = "favorite"):
         """Tests for unfavoriting/unfollowing a story."""
 
-        lst = "favorite_stories" if action == "favorite" else "followed_stories"
+        lst, actioned = STORY_ACTIONS[action]
         unaction = "un" + action
-        actioned = action + ('d' if action.endswith('e') else 'ed')
 
         # anonymous story favorite request
         for id in (self.story_ids[0], 1444):
             response = self.client.delete(f"/api/story/{id}/{action}")
-            self.assertEqual(response.json['code'], 401)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn(
-                f"Must be logged in to {unaction} a story.",
-                response.json['errors']
-            )
+            self._assert_error(response, 401, f"Must be logged in to {unaction} a story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # nonexistant/private story favorite request
         for id in (self.story_ids[1], 1444):
             response = self.client.delete(f"/api/story/{id}/{action}")
-            self.assertEqual(response.json['code'], 404)
-            self.assertEqual(response.json['type'], 'error')
-            self.assertIn("Invalid story ID.", response.json['errors'])
+            self._assert_error(response, 404, "Invalid story ID.")
         
         # story self-favorite request
         response: Response = self.client.delete(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 403)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(f"Cannot {unaction} your own story.", response.json['errors'])
+        self._assert_error(response, 403, f"Cannot {unaction} your own story.")
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
         
         # valid story favorite request
         response = self.client.post(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
         response = self.client.delete(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
+        self._assert_success(response, 200)
 
         response = self.client.get(f"/api/user/{USERDATA[1]['username']}")
-        self.assertEqual(response.json['code'], 200)
-        self.assertEqual(response.json['type'], 'success')
-        self.assertEqual(response.json['data'][lst], [])
+        self.assertEqual(self._assert_success(response, 200)[lst], [])
 
         # story refavorite request
         response = self.client.delete(f"/api/story/{self.story_ids[0]}/{action}")
-        self.assertEqual(response.json['code'], 400)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn(f"You haven't {actioned} this story.", response.json['errors'])
+        self._assert_error(response, 400, f"You haven't {actioned} this story.")
 
         # risque story favorite request for filtered user
         response = self.client.delete(f"/api/story/{self.story_ids[2]}/{action}")
-        self.assertEqual(response.json['code'], 404)
-        self.assertEqual(response.json['type'], 'error')
-        self.assertIn("Invalid story ID.", response.json['errors'])
+        self._assert_error(response, 404, "Invalid story ID.")
 
     def test_favorite(self) -> None:
         """Tests favoriting a story."""
@@ -597,26 +503,6 @@ class StoryAPITestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
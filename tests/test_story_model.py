@@ -4,12 +4,14 @@
 
 from unittest import TestCase, main
 
-from models import Chapter, connect_db, db, RefImage, Story, User
-from dbcred import get_database_uri
+from models import Chapter, db, Story, User
 
 from datetime import date
 
-from app import app
+from tests.helpers import (
+    begin_class_transaction, bind_session, count_queries, prepare_database, unbind_session,
+    use_test_database
+)
 
 # == TEST CASE =================================================================================== #
 
@@ -20,52 +22,57 @@ class StoryModelTestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
+        prepare_database()
 
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
-
-    def setUp(self) -> None:
-        super().setUp()
-
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        begin_class_transaction(cls)
 
-        Chapter.query.delete()
-        Story.query.delete()
-        User.query.delete()
+        # fixtures are created once & kept for the whole class by its outer transaction
+        bind_session(cls.connection)
 
-        self.testuser = User.register(
+        testuser = User.register(
             username = 'testuser',
             password = 'testuser',
             email = 'testuser@gmail.com',
             birthdate = date(1997, 3, 16)
         )
-        self.testuser.allow_risque = True
+        testuser.allow_risque = True
 
-        self.testuser2 = User.register(
+        testuser2 = User.register(
             username = 'testuser2',
             password = 'testuser2',
             email = 'testuser2@gmail.com',
             birthdate = date(1997, 3, 17)
         )
 
-        self.testuser3 = User.register(
+        testuser3 = User.register(
             username = 'testuser3',
             password = 'testuser3',
             email = 'testuser3@gmail.com',
             birthdate = date(1997, 3, 18)
         )
-        self.testuser3.allow_risque = True
+        testuser3.allow_risque = True
+
+        cls.testuser_id, cls.testuser2_id, cls.testuser3_id = (
+            testuser.id, testuser2.id, testuser3.id
+        )
+
+        unbind_session(keep=True)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
+
+        self.testuser = User.query.get(self.testuser_id)
+        self.testuser2 = User.query.get(self.testuser2_id)
+        self.testuser3 = User.query.get(self.testuser3_id)
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
     
     def test_new(self) -> None:
         """Tests the Story.new class method."""
@@ -84,18 +91,23 @@ class StoryModelTestCase(TestCase):
         self.assertRaises(ValueError, Story.new, self.testuser, "test", 3.2)
         
         story1 = Story.new(self.testuser, "test")
-        self.assertEqual(story1.author, self.testuser)
-        self.assertEqual(story1.flags, Story.Flags.DEFAULT)
-        self.assertEqual(story1.title, "test")
-        self.assertEqual(story1.summary, "")
-        self.assertEqual(story1.thumbnail.url, Story.DEFAULT_THUMBNAIL_URI)
-        self.assertIn(story1, self.testuser.stories)
-        self.assertEqual(len(self.testuser.stories), 1)
-        self.assertEqual(len(story1.tags), 0)
-        self.assertEqual(len(story1.favorited_by), 0)
-        self.assertEqual(len(story1.followed_by), 0)
-        self.assertEqual(len(story1.reports), 0)
-        self.assertEqual(story1.posted, story1.modified)
+        with count_queries(self.connection) as statements:
+            self.assertEqual(story1.author, self.testuser)
+            self.assertEqual(story1.flags, Story.Flags.DEFAULT)
+            self.assertEqual(story1.title, "test")
+            self.assertEqual(story1.summary, "")
+            self.assertEqual(story1.thumbnail.url, Story.DEFAULT_THUMBNAIL_URI)
+            self.assertIn(story1, self.testuser.stories)
+            self.assertEqual(len(self.testuser.stories), 1)
+            self.assertEqual(len(story1.tags), 0)
+            self.assertEqual(len(story1.favorited_by), 0)
+            self.assertEqual(len(story1.followed_by), 0)
+            self.assertEqual(len(story1.reports), 0)
+            self.assertEqual(story1.posted, story1.modified)
+
+        # savepoint restarted after Story.new's commit + story & author refreshed + thumbnail + one
+        # load each of author.stories, tags, favorited_by, followed_by & reports
+        self.assertLessEqual(len(statements), 1 + 2 + 1 + 5)
 
         story2summary = "This is a test from Speakonia."
         story2 = Story.new(self.testuser, "    test  2 ", story2summary)
@@ -203,27 +215,32 @@ class StoryModelTestCase(TestCase):
 
         db.session.commit()
 
-        visible_stories_not_logged_in = Story.visible_stories().all()
-        self.assertNotIn(story1, visible_stories_not_logged_in)
-        self.assertIn(story2, visible_stories_not_logged_in)
-        self.assertNotIn(story3, visible_stories_not_logged_in)
+        with count_queries(self.connection) as statements:
+            visible_stories_not_logged_in = Story.visible_stories().all()
+            self.assertNotIn(story1, visible_stories_not_logged_in)
+            self.assertIn(story2, visible_stories_not_logged_in)
+            self.assertNotIn(story3, visible_stories_not_logged_in)
         
-        visible_stories_allow_risque = Story.visible_stories(self.testuser3).all()
-        self.assertNotIn(story1, visible_stories_allow_risque)
-        self.assertIn(story2, visible_stories_allow_risque)
-        self.assertIn(story3, visible_stories_allow_risque)
-
-        visible_stories_no_risque = Story.visible_stories(self.testuser2).all()
-        self.assertNotIn(story1, visible_stories_no_risque)
-        self.assertIn(story2, visible_stories_no_risque)
-        self.assertNotIn(story3, visible_stories_no_risque)
-
-        # private stories should be irrelevant are irrelevant in visible stories query
-        # even when logged in as story author
-        visible_stories_no_risque = Story.visible_stories(self.testuser).all()
-        self.assertNotIn(story1, visible_stories_no_risque)
-        self.assertIn(story2, visible_stories_no_risque)
-        self.assertIn(story3, visible_stories_no_risque)
+            visible_stories_allow_risque = Story.visible_stories(self.testuser3).all()
+            self.assertNotIn(story1, visible_stories_allow_risque)
+            self.assertIn(story2, visible_stories_allow_risque)
+            self.assertIn(story3, visible_stories_allow_risque)
+
+            visible_stories_no_risque = Story.visible_stories(self.testuser2).all()
+            self.assertNotIn(story1, visible_stories_no_risque)
+            self.assertIn(story2, visible_stories_no_risque)
+            self.assertNotIn(story3, visible_stories_no_risque)
+
+            # private stories should be irrelevant are irrelevant in visible stories query
+            # even when logged in as story author
+            visible_stories_no_risque = Story.visible_stories(self.testuser).all()
+            self.assertNotIn(story1, visible_stories_no_risque)
+            self.assertIn(story2, visible_stories_no_risque)
+            self.assertIn(story3, visible_stories_no_risque)
+
+        # savepoint restarted after the commit + one query per visible_stories call + one refresh
+        # of each user it expired; nothing is loaded per story
+        self.assertLessEqual(len(statements), 1 + 4 + 3)
 
     def test_update(self) -> None:
         """Tests the Story.update function."""
@@ -351,26 +368,6 @@ class StoryModelTestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
@@ -6,12 +6,15 @@ from unittest import TestCase, main
 
 from flask.wrappers import Response
 
-from models import connect_db, db, RefImage, Story, StoryTag, Tag, User
-from dbcred import get_database_uri
+from models import db, RefImage, Story, StoryTag, Tag, User
 
-from tests.test_api import USERDATA, STORYDATA
+from tests.helpers import (
+    prepare_database, set_session_user, use_test_database, USERDATA, STORYDATA
+)
 
-from app import CURR_USER_KEY, app
+from search import SearchResults
+
+from app import app
 
 # == TEST CASE =================================================================================== #
 
@@ -22,21 +25,12 @@ class TagAPITestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
-
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
+        prepare_database()
 
     def setUp(self) -> None:
         super().setUp()
 
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        db.session.execute(RefImage.__table__.delete().where(~RefImage.id.in_((1, 2))))
 
         StoryTag.query.delete()
         Tag.query.delete()
@@ -59,17 +53,17 @@ class TagAPITestCase(TestCase):
         )
 
         db.session.add_all(tags)
-        db.session.commit()
+        db.session.flush()
 
         self.tags = [ (tag.url_safe_query_name, tag.name, tag.type) for tag in tags ]
-        self.user_ids = [ id for id in map(lambda user: user.id, users) ]
+        self.user_ids = [ user.id for user in users ]
 
         stories = [
             Story(**STORYDATA[i], author_id=self.user_ids[i]) for i in range(len(STORYDATA))
         ]
         db.session.add_all(stories)
-        db.session.commit()
-        self.story_ids = [ id for id in map(lambda story: story.id, stories) ]
+        db.session.flush()
+        self.story_ids = [ story.id for story in stories ]
 
         stories[0].tags.append(tags[0])
         stories[0].tags.append(tags[4])
@@ -126,8 +120,7 @@ class TagAPITestCase(TestCase):
             self.assertEqual(data['query_name'], tag.replace('%23', '#'))
             self.assertEqual(data['stories'], lst)
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         for index, lst in (
             (5, []),
@@ -157,8 +150,7 @@ class TagAPITestCase(TestCase):
             self.assertEqual(response.json["type"], "error")
             self.assertIn("Must be logged in to add tags to a story.", response.json["errors"])
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
+        set_session_user(self.client, self.user_ids[2])
 
         response: Response = self.client.put(f"/api/story/1445/tags")
         self.assertEqual(response.json["code"], 404)
@@ -170,8 +162,7 @@ class TagAPITestCase(TestCase):
         self.assertEqual(response.json["type"], "error")
         self.assertIn("Insufficient credentials.", response.json["errors"])
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         response = self.client.put(f"/api/story/{self.story_ids[0]}/tags", json={})
         self.assertEqual(response.json["code"], 400)
@@ -253,8 +244,7 @@ class TagAPITestCase(TestCase):
             self.assertEqual(response.json["type"], "error")
             self.assertIn("Must be logged in to remove tags from a story.", response.json["errors"])
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[2]
+        set_session_user(self.client, self.user_ids[2])
 
         response: Response = self.client.delete(f"/api/story/1445/tags")
         self.assertEqual(response.json["code"], 404)
@@ -266,8 +256,7 @@ class TagAPITestCase(TestCase):
         self.assertEqual(response.json["type"], "error")
         self.assertIn("Insufficient credentials.", response.json["errors"])
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         response = self.client.delete(f"/api/story/{self.story_ids[0]}/tags", json={})
         self.assertEqual(response.json["code"], 400)
@@ -331,29 +320,29 @@ class TagAPITestCase(TestCase):
         self.assertEqual(response.json["code"], 200)
         self.assertEqual(response.json["type"], "success")
 
-if __name__ == "__main__":
-    from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
+    def test_search_unknown_tags_and_users(self) -> None:
+        """Tests searches that include only nonexistant tags or users, which find nothing."""
 
-    app.config['SQLALCHEMY_ECHO'] = False
+        # control: existing tags & users narrow the results down
+        for filters in (
+            { "include_tags": [self.tags[0][0]] },
+            { "include_users": [USERDATA[0]["username"]] }
+        ):
+            with self.subTest(**filters):
+                results = SearchResults(**filters)
+                self.assertEqual([ story.id for story in results.results ], [self.story_ids[0]])
 
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
+        for filters in (
+            { "include_tags": ["genre:nonexistant"] },
+            { "include_users": ["nonexistant"] }
+        ):
+            with self.subTest(**filters):
+                results = SearchResults(**filters)
+                self.assertEqual(results.results, [])
+                self.assertEqual((results.num_results, results.start, results.end), (0, 0, 0))
+
+if __name__ == "__main__":
+    from sys import argv
 
+    use_test_database(*argv[1:3])
     main()
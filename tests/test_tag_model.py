@@ -4,23 +4,9 @@
 
 from unittest import TestCase, main
 
-from models import connect_db, db, Tag
-from dbcred import get_database_uri
-
-from app import app
-app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-    "fictionsource-test",
-    cred_file = ".dbtestcred",
-    save = False
-)
-if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = None,
-        save = False
-    )
-
-app.config['SQLALCHEMY_ECHO'] = False
+from models import db, Tag
+
+from tests.helpers import prepare_database, use_test_database
 
 # == TEST CASE =================================================================================== #
 
@@ -31,9 +17,7 @@ class TagModelTestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
+        prepare_database()
 
     def setUp(self) -> None:
         super().setUp()
@@ -131,12 +115,5 @@ class TagModelTestCase(TestCase):
 if __name__ == "__main__":
     from sys import argv
 
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
-
+    use_test_database(*argv[1:3])
     main()
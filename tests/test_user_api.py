@@ -6,12 +6,14 @@ from unittest import TestCase, main
 
 from flask.wrappers import Response
 
-from models import connect_db, db, FollowingUser, from_timestamp, RefImage, Story, User
-from dbcred import get_database_uri
+from models import from_timestamp, User
 
-from tests.test_api import generate_basicauth_credentials, USERDATA
+from tests.helpers import (
+    begin_class_transaction, bind_session, generate_basicauth_credentials, prepare_database,
+    seed_users, set_session_user, unbind_session, use_test_database, USERDATA
+)
 
-from app import CURR_USER_KEY, app
+from app import app
 
 # == TEST CASE =================================================================================== #
 
@@ -22,36 +24,27 @@ class UserAPITestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
+        prepare_database()
 
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
+        begin_class_transaction(cls)
 
-    def setUp(self) -> None:
-        super().setUp()
+        cls.user_ids = seed_users(cls.connection)
 
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        cls.client = app.test_client()
 
-        FollowingUser.query.delete()
-        Story.query.delete()
-        User.query.delete()
+    def setUp(self) -> None:
+        super().setUp()
 
-        self.client = app.test_client()
+        self.savepoint = self.connection.begin_nested()
+        bind_session(self.connection)
 
-        users = [ User(**data) for data in USERDATA ]
-        db.session.add_all(users)
-        db.session.commit()
-        self.user_ids = [ id for id in map(lambda user: user.id, users) ]
+        self.client.cookie_jar.clear()
 
     def tearDown(self) -> None:
         super().tearDown()
-        db.session.rollback()
+
+        unbind_session()
+        self.savepoint.rollback()
         
     def test_get(self) -> None:
         """Tests retrieving a user's information."""
@@ -82,8 +75,7 @@ class UserAPITestCase(TestCase):
         self.assertNotIn('comments', data)
         self.assertNotIn('allow_risque', data)
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
         
         response = self.client.get(f"/api/user/{USERDATA[0]['username']}")
         self.assertEqual(response.json['code'], 200)
@@ -104,8 +96,7 @@ class UserAPITestCase(TestCase):
         self.assertNotIn('comments', data)
         self.assertNotIn('allow_risque', data)
         
-        with self.client.session_transaction() as session:
-            del session[CURR_USER_KEY]
+        set_session_user(self.client, None)
         
         # priviledged user data request
         response = self.client.get(f"/api/user/{USERDATA[0]['username']}", headers={
@@ -131,8 +122,7 @@ class UserAPITestCase(TestCase):
         self.assertEqual(data["comments"], [])
         self.assertEqual(data['allow_risque'], USERDATA[0]['flags'] & User.Flags.ALLOW_RISQUE > 0)
 
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         response = self.client.get(f"/api/user/{USERDATA[0]['username']}")
         self.assertEqual(response.json['code'], 200)
@@ -174,8 +164,7 @@ class UserAPITestCase(TestCase):
         self.assertIn("Insufficient credentials.", response.json['errors'])
         self.assertEqual(len(response.json['errors']), 1)
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[1]
+        set_session_user(self.client, self.user_ids[1])
 
         # unprivileged user edit request
         response = self.client.patch("/api/user/testuser", json={
@@ -186,8 +175,7 @@ class UserAPITestCase(TestCase):
         self.assertIn("Insufficient credentials.", response.json['errors'])
         self.assertEqual(len(response.json['errors']), 1)
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # errnoenous privledged user edit requests
         response = self.client.patch("/api/user/testuser", json=[1, 2, 3])
@@ -286,8 +274,7 @@ class UserAPITestCase(TestCase):
         self.assertIn("Must be logged in to follow a user.", response.json['errors'])
         self.assertEqual(len(response.json['errors']), 1)
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # self-follow request
         response = self.client.post("/api/user/testuser/follow")
@@ -339,8 +326,7 @@ class UserAPITestCase(TestCase):
         self.assertIn("Must be logged in to unfollow a user.", response.json['errors'])
         self.assertEqual(len(response.json['errors']), 1)
         
-        with self.client.session_transaction() as session:
-            session[CURR_USER_KEY] = self.user_ids[0]
+        set_session_user(self.client, self.user_ids[0])
 
         # self-unfollow request
         response = self.client.delete("/api/user/testuser/follow")
@@ -385,26 +371,6 @@ class UserAPITestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()
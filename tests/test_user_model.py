@@ -4,12 +4,13 @@
 
 from unittest import TestCase, main
 
-from models import connect_db, db, RefImage, Story, User
-from dbcred import get_database_uri
+from models import db, RefImage, Story, User
 
 from datetime import date
 from dateutil.relativedelta import relativedelta
 
+from tests.helpers import prepare_database, use_test_database
+
 from app import app
 
 # == TEST CASE =================================================================================== #
@@ -21,21 +22,12 @@ class UserModelTestCase(TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
 
-        connect_db(app)
-        db.drop_all()
-        db.create_all()
-
-        db.session.add_all((
-            RefImage(_url=User.DEFAULT_IMAGE_URI),
-            RefImage(_url=Story.DEFAULT_THUMBNAIL_URI)
-        ))
-        db.session.commit()
+        prepare_database()
 
     def setUp(self) -> None:
         super().setUp()
 
-        for img in RefImage.query.filter(~RefImage.id.in_({1, 2})).all():
-            db.session.delete(img)
+        db.session.execute(RefImage.__table__.delete().where(~RefImage.id.in_((1, 2))))
 
         Story.query.delete()
         User.query.delete()
@@ -282,26 +274,6 @@ class UserModelTestCase(TestCase):
 
 if __name__ == "__main__":
     from sys import argv
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-        "fictionsource-test",
-        cred_file = ".dbtestcred",
-        save = False
-    )
-    if app.config['SQLALCHEMY_DATABASE_URI'] is None:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            cred_file = None,
-            save = False
-        )
-    app.config['SQLALCHEMY_ECHO'] = False
-
-    if len(argv) > 1:
-        app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri(
-            "fictionsource-test",
-            argv[1],
-            argv[2] if len(argv) > 2 else None,
-            cred_file = ".dbtestcred"
-        )
 
+    use_test_database(*argv[1:3])
     main()